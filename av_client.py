@@ -0,0 +1,79 @@
+import streamlit as st
+import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+
+# -------- Alpha Vantage API Call for EPS and Stock Prices -------- #
+# Shared session so connections (and TLS handshakes) are reused across calls
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Key holding the payload for each endpoint; anything else is not worth caching
+_PAYLOAD_KEYS = {
+    "EARNINGS": "annualEarnings",
+    "TIME_SERIES_MONTHLY_ADJUSTED": "Monthly Adjusted Time Series",
+}
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def query_alpha_vantage(ticker, function, api_key):
+    url = f"https://www.alphavantage.co/query?function={function}&symbol={ticker}&apikey={api_key}"
+    response = _SESSION.get(url, timeout=(3.05, 10))
+    response.raise_for_status()
+    try:
+        data = orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise RuntimeError(f"Unexpected response from Alpha Vantage: {e}") from e
+
+    # Raise instead of returning so that failed responses are never cached
+    if "Note" in data:
+        raise RuntimeError("API limit reached. Please try again later.")
+    if "Information" in data:
+        raise RuntimeError(f"Alpha Vantage request not served: {data['Information']}")
+    if "Error Message" in data:
+        raise RuntimeError(f"Invalid API request: {data['Error Message']}")
+    payload_key = _PAYLOAD_KEYS.get(function)
+    if payload_key and payload_key not in data:
+        raise RuntimeError(f"No {function} data returned for {ticker}.")
+
+    return data
+
+def get_alpha_vantage_datasets(ticker, functions):
+    if not functions:
+        return []
+
+    api_key = st.secrets["alpha_vantage"]["api_key"]
+
+    # Requests are I/O bound and independent, so issue them concurrently.
+    # At most 5 in flight to stay within the free-tier rate limit.
+    with ThreadPoolExecutor(max_workers=min(len(functions), 5)) as executor:
+        futures = [executor.submit(query_alpha_vantage, ticker, function, api_key) for function in functions]
+
+    # Report errors from the main thread, where Streamlit elements can render
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except RuntimeError as e:
+            st.error(str(e))
+            results.append({})
+        except requests.RequestException as e:
+            st.error(f"Failed to reach Alpha Vantage: {e}")
+            results.append({})
+
+    return results
+
+def fetch_eps_and_prices(ticker):
+    st.write("Fetching EPS and Stock Price Data...")
+
+    earnings, stock_prices = get_alpha_vantage_datasets(ticker, ["EARNINGS", "TIME_SERIES_MONTHLY_ADJUSTED"])
+
+    if not earnings or not stock_prices:
+        st.warning("Some data could not be retrieved. Please verify the ticker or API status.")
+    
+    return earnings, stock_prices
@@ -0,0 +1,18 @@
+import plotly.express as px
+
+# --------- Stock Price vs Fair Value Chart --------- #
+def fair_value_chart(fair_value_df, ticker, log_scale=False):
+    # Plotly figures render client-side, so no server-side rasterization per rerun
+    chart_df = fair_value_df.rename(columns={
+        'adjusted_close': 'Actual Stock Price',
+        'fair_value': 'EPS-based Fair Value'
+    })
+    return px.line(
+        chart_df,
+        x='Year',
+        y=['Actual Stock Price', 'EPS-based Fair Value'],
+        markers=True,
+        log_y=log_scale,
+        labels={'value': 'Price (USD)', 'variable': ''},
+        title=f'{ticker} Stock Price vs EPS-derived Fair Value'
+    )
@@ -1,80 +1,39 @@
 import streamlit as st
-import requests
 import pandas as pd
-import matplotlib.pyplot as plt
 from openai import OpenAI
 
-st.set_page_config(layout="wide")
-
-# -------- Alpha Vantage API Call for EPS and Stock Prices -------- #
-def get_alpha_vantage_data(ticker, function):
-    api_key = st.secrets["alpha_vantage"]["api_key"]
-    url = f"https://www.alphavantage.co/query?function={function}&symbol={ticker}&apikey={api_key}"
-    response = requests.get(url)
-    data = response.json()
-
-    if "Note" in data:
-        st.error("API limit reached. Please try again later.")
-        return {}
-    if "Error Message" in data:
-        st.error(f"Invalid API request: {data['Error Message']}")
-        return {}
-
-    return data
-
-def fetch_eps_and_prices(ticker):
-    st.write("Fetching EPS and Stock Price Data...")
-
-    earnings = get_alpha_vantage_data(ticker, "EARNINGS")
-    stock_prices = get_alpha_vantage_data(ticker, "TIME_SERIES_MONTHLY_ADJUSTED")
-
-    if not earnings or not stock_prices:
-        st.warning("Some data could not be retrieved. Please verify the ticker or API status.")
-    
-    return earnings, stock_prices
-
-# --------- Transform and Fair Value Calculation --------- #
-def prepare_fair_value_data(earnings, stock_prices):
-    if "annualEarnings" not in earnings or "Monthly Adjusted Time Series" not in stock_prices:
-        return pd.DataFrame()
-
-    # EPS Data
-    eps_df = pd.DataFrame(earnings['annualEarnings'])
-    eps_df['Year'] = pd.to_datetime(eps_df['fiscalDateEnding']).dt.year
-    eps_df['reportedEPS'] = pd.to_numeric(eps_df['reportedEPS'], errors='coerce')
-    eps_df = eps_df.dropna().sort_values('Year')
-
-    # Stock Price Data (end of year close)
-    price_df = pd.DataFrame(stock_prices['Monthly Adjusted Time Series']).T
-    price_df.index = pd.to_datetime(price_df.index)
-    price_df['adjusted_close'] = pd.to_numeric(price_df['5. adjusted close'], errors='coerce')
-    price_df['Year'] = price_df.index.year
-    price_df = price_df.groupby('Year').last().reset_index()[['Year', 'adjusted_close']]
-
-    # Merge on Year
-    merged_df = pd.merge(eps_df, price_df, on='Year', how='inner')
+from av_client import fetch_eps_and_prices
+from valuation import prepare_fair_value_data
+from charts import fair_value_chart
 
-    # Calculate P/E
-    merged_df['pe_ratio'] = merged_df['adjusted_close'] / merged_df['reportedEPS']
-
-    return merged_df
+st.set_page_config(layout="wide")
 
 # --------- OpenAI GPT-4o Summary Function -------- #
-def get_company_growth_initiatives_openai(ticker):
-    client = OpenAI(api_key=st.secrets["openai"]["api_key"])
+@st.cache_resource
+def get_openai_client():
+    # One long-lived client so its HTTP connection pool is reused across calls
+    return OpenAI(api_key=st.secrets["openai"]["api_key"])
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def query_growth_initiatives(ticker):
+    client = get_openai_client()
     prompt = f"Research and summarize the stated growth initiatives and timeline for the company associated with the stock ticker {ticker}. Keep it concise and in bullet points if possible."
 
+    response = client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": "You are a helpful financial analyst."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=1500,
+        temperature=0.5
+    )
+    return response.choices[0].message.content.strip()
+
+def get_company_growth_initiatives_openai(ticker):
+    # Errors propagate out of the cached call, so failures are not cached
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a helpful financial analyst."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1500,
-            temperature=0.5
-        )
-        return response.choices[0].message.content.strip()
+        return query_growth_initiatives(ticker)
     except Exception as e:
         st.error(f"Failed to fetch growth initiatives: {e}")
         return "Could not fetch growth initiatives."
@@ -92,14 +51,23 @@ if stock_ticker:
     if not fair_value_df.empty:
         st.subheader("Fair Value Estimation Settings")
 
-        # --------- P/E Multiple Options --------- #
-        pe_option = st.selectbox(
-            "Choose P/E Multiple Option:",
-            ["Average of All Years", "Average of Last 3 Years", "Average of Last 5 Years", "Average of Last 10 Years", "Custom P/E Multiple"]
-        )
-
         # Default Average
-        default_avg_pe = fair_value_df['pe_ratio'].mean()
+        default_avg_pe = float(fair_value_df['pe_ratio'].mean())
+
+        # Editing settings doesn't rerun the app; a submit still reruns the whole script
+        with st.form("valuation_settings"):
+            # --------- P/E Multiple Options --------- #
+            pe_option = st.selectbox(
+                "Choose P/E Multiple Option:",
+                ["Average of All Years", "Average of Last 3 Years", "Average of Last 5 Years", "Average of Last 10 Years", "Custom P/E Multiple"]
+            )
+            # Always shown: widgets inside a form can't appear conditionally before submit
+            custom_pe = st.number_input("Custom P/E Multiple (used with the Custom option):", min_value=0.0, value=default_avg_pe if default_avg_pe > 0 else 0.0, step=1.0)
+
+            # --------- Y-Axis Scale Option --------- #
+            y_axis_type = st.radio("Select Y-Axis Scale:", ["Linear", "Logarithmic"], index=0)
+
+            st.form_submit_button("Update")
 
         # Last X years average
         if pe_option == "Average of Last 3 Years":
@@ -109,31 +77,23 @@ if stock_ticker:
         elif pe_option == "Average of Last 10 Years":
             avg_pe = fair_value_df.tail(10)['pe_ratio'].mean()
         elif pe_option == "Custom P/E Multiple":
-            avg_pe = st.number_input("Enter Custom P/E Multiple:", min_value=0.0, value=default_avg_pe, step=1.0)
+            avg_pe = custom_pe
         else:  # Average of All Years
             avg_pe = default_avg_pe
 
-        # --------- Y-Axis Scale Option --------- #
-        y_axis_type = st.radio("Select Y-Axis Scale:", ["Linear", "Logarithmic"], index=0)
-
         # Calculate Fair Value
         fair_value_df['fair_value'] = fair_value_df['reportedEPS'] * avg_pe
 
         # --------- Plot --------- #
         st.subheader("Stock Price vs EPS-based Fair Value Estimate")
-        st.write(f"**P/E Multiple Used:** {avg_pe:.2f}")
-
-        fig, ax = plt.subplots(figsize=(12, 6))
-        ax.plot(fair_value_df['Year'], fair_value_df['adjusted_close'], label='Actual Stock Price', marker='o')
-        ax.plot(fair_value_df['Year'], fair_value_df['fair_value'], label='EPS-based Fair Value', marker='o')
-        ax.set_xlabel('Year')
-        ax.set_ylabel('Price (USD)')
-        ax.set_title(f'{stock_ticker} Stock Price vs EPS-derived Fair Value')
-        ax.legend()
-        ax.grid(True)
-        if y_axis_type == "Logarithmic":
-            ax.set_yscale('log')
-        st.pyplot(fig)
+        if pd.isna(avg_pe):
+            # P/E is undefined for loss years, so the window may have no multiple at all
+            st.warning("No year with positive EPS in the selected window, so no P/E multiple is available. Choose a longer window or a custom P/E.")
+        else:
+            st.write(f"**P/E Multiple Used:** {avg_pe:.2f}")
+
+            fig = fair_value_chart(fair_value_df, stock_ticker, log_scale=(y_axis_type == "Logarithmic"))
+            st.plotly_chart(fig)
 
         # --------- Data Table --------- #
         st.subheader("EPS, Stock Price, P/E Ratio, and Fair Value Table")
@@ -151,6 +111,10 @@ if stock_ticker:
 
     # --------- Company Growth Initiatives --------- #
     st.subheader("Company Growth Initiatives and Timeline")
-    with st.spinner("Fetching company growth initiatives using GPT-4o..."):
-        growth_initiatives = get_company_growth_initiatives_openai(stock_ticker)
-        st.write(growth_initiatives)
\ No newline at end of file
+    # Keep the summary in session state so it survives reruns (e.g. form submits)
+    growth_key = f"growth_{stock_ticker}"
+    if st.button("Fetch growth initiatives"):
+        with st.spinner("Fetching company growth initiatives using GPT-4o..."):
+            st.session_state[growth_key] = get_company_growth_initiatives_openai(stock_ticker)
+    if growth_key in st.session_state:
+        st.write(st.session_state[growth_key])
\ No newline at end of file
@@ -0,0 +1,50 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# --------- Transform and Fair Value Calculation --------- #
+@st.cache_data(ttl=3600, show_spinner=False)
+def prepare_fair_value_data(earnings, stock_prices):
+    if "annualEarnings" not in earnings or "Monthly Adjusted Time Series" not in stock_prices:
+        return pd.DataFrame()
+
+    # EPS Data
+    # Only the fiscal date and EPS are used, so skip the other fields
+    eps_df = pd.DataFrame(earnings['annualEarnings'], columns=['fiscalDateEnding', 'reportedEPS'])
+    eps_df['Year'] = eps_df['fiscalDateEnding'].str.slice(0, 4).astype('int16')
+    eps_df['reportedEPS'] = pd.to_numeric(eps_df['reportedEPS'], errors='coerce')
+    eps_df = eps_df.dropna().sort_values('Year')
+
+    # Stock Price Data (end of year close)
+    monthly_series = stock_prices['Monthly Adjusted Time Series']
+    closes = np.fromiter(
+        (float(values['5. adjusted close']) for values in monthly_series.values()),
+        dtype=np.float64,
+        count=len(monthly_series)
+    )
+    price_df = pd.DataFrame({'adjusted_close': closes}, index=pd.to_datetime(list(monthly_series), format='%Y-%m-%d'))
+    # Alpha Vantage lists months newest first; sort and keep the last month of each year
+    price_df = price_df.sort_index()
+    price_df['Year'] = price_df.index.year
+    price_df = price_df[~price_df['Year'].duplicated(keep='last')]
+    close_by_year = price_df.set_index('Year')['adjusted_close']
+
+    # Look up each year's close (inner join semantics: drop years without a price)
+    eps_df['adjusted_close'] = eps_df['Year'].map(close_by_year)
+    merged_df = eps_df.dropna(subset=['adjusted_close']).reset_index(drop=True)
+
+    # Calculate P/E (undefined for non-positive EPS, so NaN instead of inf/negative)
+    eps = merged_df['reportedEPS'].to_numpy()
+    close = merged_df['adjusted_close'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        merged_df['pe_ratio'] = np.where(eps > 0, close / eps, np.nan)
+
+    # Values are only displayed and plotted, so single precision is plenty
+    merged_df = merged_df.astype({
+        'Year': 'int16',
+        'reportedEPS': 'float32',
+        'adjusted_close': 'float32',
+        'pe_ratio': 'float32'
+    })
+
+    return merged_df